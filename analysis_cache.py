@@ -0,0 +1,75 @@
+"""
+Persistent cache for Azure OpenAI analysis results.
+Results are stored in SQLite keyed by a SHA-256 hash of the request body, so
+reruns skip publications that were already analyzed with the same prompt and model.
+"""
+
+import hashlib
+import json
+import sqlite3
+from typing import Dict, Any, Optional
+
+class AnalysisCache:
+    """
+    SQLite-backed cache of analysis results.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, result TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(request: Dict[str, Any]) -> str:
+        """
+        Hash a chat completion request body into a cache key.
+
+        Args:
+            request: Request body (model, messages and sampling parameters)
+
+        Returns:
+            Hex-encoded SHA-256 digest of the canonical JSON request
+        """
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    def get(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached analysis for a request.
+
+        Args:
+            request: Request body
+
+        Returns:
+            The cached analysis dictionary, or None on a miss
+        """
+        row = self._conn.execute(
+            "SELECT result FROM analyses WHERE key = ?", (self.make_key(request),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, request: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """
+        Store the analysis for a request.
+
+        Args:
+            request: Request body
+            result: Analysis dictionary returned by the model
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO analyses (key, result) VALUES (?, ?)",
+            (self.make_key(request), json.dumps(result))
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+        """
+        self._conn.close()
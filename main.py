@@ -4,13 +4,24 @@ Analyzes PubMed publications for foreign disclosure requirements.
 """
 
 import os
+import re
 import csv
 import json
+import asyncio
+import hashlib
+import argparse
+import functools
 import logging
 from datetime import datetime
-import pandas as pd
+from typing import List
+import httpx
+import tiktoken
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
+from pydantic import BaseModel, ConfigDict
+from rate_limiter import RateLimiter
+from mcp_server_clinical_research import use_pubmed_search_async
+from analysis_cache import AnalysisCache
 
 # Configure logging
 logging.basicConfig(
@@ -23,17 +34,37 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # Azure OpenAI configuration
+# Transient failures (429, 5xx, timeouts, connection errors) are retried by the
+# SDK with exponential backoff, honoring the Retry-After header when present
+AZURE_OPENAI_MAX_RETRIES = 3
+# Keep-alive connection pool sized for the concurrent real-time requests
+AZURE_OPENAI_MAX_CONNECTIONS = 64
+AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS = 32
+AZURE_OPENAI_TIMEOUT = 60.0
+
 try:
     # Check if all required environment variables are set
     if (os.getenv("AZURE_OPENAI_API_ENDPOINT") and 
         os.getenv("AZURE_OPENAI_API_KEY") and 
         os.getenv("AZURE_OPENAI_API_VERSION")):
         
+        # Reuse pooled HTTP/2 connections instead of a new TLS handshake per burst
+        http_client = DefaultAsyncHttpxClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=AZURE_OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=AZURE_OPENAI_TIMEOUT
+        )
+
         # Initialize the Azure OpenAI client with required parameters
-        client = AzureOpenAI(
+        client = AsyncAzureOpenAI(
             azure_endpoint=os.getenv("AZURE_OPENAI_API_ENDPOINT"),
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION")
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+            max_retries=AZURE_OPENAI_MAX_RETRIES,
+            http_client=http_client
         )
         
         logger.info("Successfully initialized Azure OpenAI client")
@@ -42,13 +73,28 @@ try:
         raise ValueError("Missing required Azure OpenAI environment variables. Please check your .env file.")
 except Exception as e:
     # If there's an error, log it and re-raise
-    logger.error(f"Error initializing Azure OpenAI client: {str(e)}")
+    logger.error("Error initializing Azure OpenAI client: %s", e)
     raise ValueError(f"Failed to initialize Azure OpenAI client: {str(e)}")
 
 # Constants
 COUNTRIES_OF_CONCERN = ["Russia", "North Korea", "Iran", "China"]
+
+# Single compiled alternation matching any country of concern, case-insensitively
+COUNTRIES_OF_CONCERN_RE = re.compile('|'.join(re.escape(c) for c in COUNTRIES_OF_CONCERN), re.IGNORECASE)
+
 OUTPUT_FILE = "foreign_disclosure_analysis.csv"
 MODEL_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT")
+MODEL_NAME = os.getenv("AZURE_OPENAI_MODEL", "gpt-4o")
+MAX_CONCURRENT_REQUESTS = 16
+MAX_CONCURRENT_PUBMED_QUERIES = 8
+ANALYSIS_BATCH_SIZE = 5
+REQUESTS_PER_MINUTE = int(os.getenv("AZURE_OPENAI_RPM", "180"))
+TOKENS_PER_MINUTE = int(os.getenv("AZURE_OPENAI_TPM", "30000"))
+ANALYSIS_CACHE_FILE = ".analysis_cache.sqlite"
+BATCH_INPUT_FILE = "batch_input.jsonl"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = 60
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
 OUTPUT_COLUMNS = [
     "publication_name",
     "research_title",
@@ -61,6 +107,48 @@ OUTPUT_COLUMNS = [
     "funding_source"
 ]
 
+class ForeignAffiliationAnalysis(BaseModel):
+    """
+    Schema of the analysis Azure OpenAI returns for a publication.
+    Enforced server-side through structured outputs.
+    """
+    model_config = ConfigDict(extra='forbid')
+
+    countries: List[str]
+    institutions: List[str]
+    funding_sources: List[str]
+    confidence_score: int
+    explanation: str
+
+ANALYSIS_SYSTEM_PROMPT = (
+    "You are an expert in analyzing scientific publications for foreign affiliations and collaborations. "
+    "Analyze the publication metadata provided by the user, particularly focusing on Russia, North Korea, Iran, and China. "
+    "Report: countries (all foreign countries mentioned or implied), institutions (foreign institutions involved), "
+    "funding_sources (any foreign funding sources identified), confidence_score (1-10, regarding foreign involvement), "
+    "and explanation (brief justification for the confidence score)."
+)
+ANALYSIS_MAX_TOKENS = 400
+ABSTRACT_TOKEN_LIMIT = 1200
+AFFILIATIONS_TOKEN_LIMIT = 600
+
+class PublicationAnalyses(BaseModel):
+    """
+    Schema of a response analyzing several publications, in request order.
+    """
+    model_config = ConfigDict(extra='forbid')
+
+    analyses: List[ForeignAffiliationAnalysis]
+
+# Strict JSON schema response format, serializable into Batch API request bodies
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "foreign_affiliation_analysis",
+        "strict": True,
+        "schema": ForeignAffiliationAnalysis.model_json_schema()
+    }
+}
+
 def load_researchers(file_path='researchers.csv'):
     """
     Load researcher data from CSV file.
@@ -68,57 +156,50 @@ def load_researchers(file_path='researchers.csv'):
     """
     try:
         researchers = []
-        with open(file_path, 'r') as f:
-            # Read the first line to get the header
-            header_line = f.readline().strip()
+        with open(file_path, 'r', newline='') as f:
+            reader = csv.DictReader(f, skipinitialspace=True)
             
             # Check if the file is empty
-            if not header_line:
+            if not reader.fieldnames:
                 logger.error("Empty researchers file")
                 return []
             
-            # Parse the header line to get column names
-            if ',' in header_line:
-                columns = [col.strip() for col in header_line.split(',')]
-                last_name_col = columns[0]
-                first_name_col = columns[1]
+            # Use the first two header columns as last and first name
+            if len(reader.fieldnames) >= 2:
+                last_name_col, first_name_col = reader.fieldnames[0], reader.fieldnames[1]
             else:
                 # Default column names if header is not as expected
                 last_name_col = "Researcher last name"
                 first_name_col = "Research first name"
+                reader.fieldnames = [last_name_col, first_name_col]
             
-            # Read the rest of the lines
-            for line in f:
-                line = line.strip()
-                if not line:
+            for row in reader:
+                last_name = row.get(last_name_col)
+                first_name = row.get(first_name_col)
+                if last_name is None or first_name is None:
                     continue
                 
-                # Split the line by comma
-                parts = [part.strip() for part in line.split(',')]
-                if len(parts) >= 2:
-                    researchers.append({
-                        'last_name': parts[0],
-                        'first_name': parts[1]
-                    })
+                researchers.append({
+                    'last_name': last_name.strip(),
+                    'first_name': first_name.strip()
+                })
         
-        logger.info(f"Loaded {len(researchers)} researchers from {file_path}")
+        logger.info("Loaded %d researchers from %s", len(researchers), file_path)
         return researchers
     except Exception as e:
-        logger.error(f"Error loading researchers from {file_path}: {str(e)}")
+        logger.error("Error loading researchers from %s: %s", file_path, e)
         raise
 
-def query_pubmed_publications(researcher):
+async def query_pubmed_publications(researcher):
     """
     Query PubMed for publications by a researcher using the Clinical Research MCP Server.
     """
     try:
-        from mcp_server_clinical_research import use_pubmed_search
-        
         # Construct query with researcher name and affiliation
         query = f"{researcher['last_name']}, {researcher['first_name']}[Author] AND Boston Children's Hospital[Affiliation]"
         
         # Query PubMed via the MCP Server
-        response = use_pubmed_search({
+        response = await use_pubmed_search_async({
             "query": query,
             "max_results": 25,
             "sort_by": "date",
@@ -126,24 +207,109 @@ def query_pubmed_publications(researcher):
             "format": "default"
         })
         
-        # Process the response
-        if isinstance(response, dict) and 'results' in response:
-            publications = response['results']
-            logger.info(f"Retrieved {len(publications)} publications for {researcher['first_name']} {researcher['last_name']}")
-            return publications
-        elif isinstance(response, list):
-            logger.info(f"Retrieved {len(response)} publications for {researcher['first_name']} {researcher['last_name']}")
+        # Process the response; use_pubmed_search_async returns a list of Publication records
+        if isinstance(response, list):
+            logger.info("Retrieved %d publications for %s %s", len(response), researcher['first_name'], researcher['last_name'])
             return response
         else:
-            logger.warning(f"Unexpected response format for {researcher['first_name']} {researcher['last_name']}")
+            logger.warning("Unexpected response format for %s %s", researcher['first_name'], researcher['last_name'])
             return []
     except Exception as e:
-        logger.error(f"Error querying PubMed for {researcher['first_name']} {researcher['last_name']}: {str(e)}")
+        logger.error("Error querying PubMed for %s %s: %s", researcher['first_name'], researcher['last_name'], e)
         return []
 
-def analyze_foreign_affiliations(publication_data):
+@functools.lru_cache(maxsize=None)
+def get_encoding():
+    """
+    Get the tiktoken encoding for the configured model.
+    Loaded once and shared across calls; tiktoken encoders are thread-safe.
+    """
+    try:
+        return tiktoken.encoding_for_model(MODEL_NAME)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def truncate_tokens(text, max_tokens):
+    """
+    Truncate text to at most max_tokens tokens.
+    """
+    encoding = get_encoding()
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+def format_publication_fields(publication_data):
+    """
+    Format the labeled publication fields sent to the model.
+    """
+    return (
+        f"Title: {publication_data.title or ''}\n"
+        f"Authors and Affiliations: {truncate_tokens(publication_data.affiliations or '', AFFILIATIONS_TOKEN_LIMIT)}\n"
+        f"Abstract: {truncate_tokens(publication_data.abstract or '', ABSTRACT_TOKEN_LIMIT)}\n"
+        f"Funding Information: {publication_data.funding_info or ''}"
+    )
+
+def build_analysis_request(publication_data):
+    """
+    Build the chat completion request body for a publication.
+    Shared by the real-time and Batch API analysis paths.
+    """
+    # Only the publication fields vary per request; instructions live in the system message
+    prompt = format_publication_fields(publication_data)
+
+    return {
+        "model": MODEL_DEPLOYMENT,
+        "messages": [
+            {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        # Deterministic sampling so cached results match a fresh call
+        "temperature": 0,
+        "max_tokens": ANALYSIS_MAX_TOKENS,
+        "response_format": ANALYSIS_RESPONSE_FORMAT
+    }
+
+def build_multi_analysis_request(publications):
+    """
+    Build a single chat completion request body analyzing several publications.
+    The response holds one analysis per publication, in order; callers parse it
+    with the PublicationAnalyses response format.
+    """
+    entries = '\n\n'.join(
+        f"Publication {i}:\n{format_publication_fields(pub)}" for i, pub in enumerate(publications, 1)
+    )
+    prompt = (
+        f"Analyze each of the following {len(publications)} publications separately and return "
+        f"exactly {len(publications)} analyses, in the same order.\n\n{entries}"
+    )
+
+    return {
+        "model": MODEL_DEPLOYMENT,
+        "messages": [
+            {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0,
+        "max_tokens": ANALYSIS_MAX_TOKENS * len(publications)
+    }
+
+def estimate_request_tokens(request):
+    """
+    Estimate the tokens a chat completion request counts against the TPM quota:
+    the prompt tokens plus the max_tokens completion budget.
+    """
+    encoding = get_encoding()
+
+    # Each message carries a few tokens of role/formatting overhead
+    prompt_tokens = sum(len(encoding.encode(message["content"])) + 4 for message in request["messages"])
+    return prompt_tokens + request["max_tokens"]
+
+async def analyze_foreign_affiliations(publication_data, rate_limiter=None, cache=None):
     """
     Use Azure OpenAI to analyze publication data for foreign affiliations.
+    If a rate limiter is given, the request's RPM/TPM budget is reserved before the call.
+    If a cache is given, previously analyzed requests are returned without calling the API.
     Returns a dictionary containing analysis results.
     """
     try:
@@ -151,45 +317,197 @@ def analyze_foreign_affiliations(publication_data):
         if client is None:
             # If client is not available, raise an exception
             raise ValueError("Azure OpenAI client is not available. Please check your API credentials.")
-            
-        prompt = f"""
-        Analyze the following publication metadata for foreign affiliations and collaborations,
-        particularly focusing on Russia, North Korea, Iran, and China.
-
-        Title: {publication_data.get('title', '')}
-        Authors and Affiliations: {publication_data.get('affiliations', '')}
-        Abstract: {publication_data.get('abstract', '')}
-        Funding Information: {publication_data.get('funding_info', '')}
-
-        Please provide a JSON response with the following information:
-        1. List of all foreign countries mentioned or implied
-        2. Foreign institutions involved
-        3. Any foreign funding sources identified
-        4. Confidence score (1-10) regarding foreign involvement
-        5. Detailed explanation for the confidence score
-        """
-
-        # Use the latest OpenAI API format
-        response = client.chat.completions.create(
-            model=MODEL_DEPLOYMENT,
-            messages=[
-                {"role": "system", "content": "You are an expert in analyzing scientific publications for foreign affiliations and collaborations."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2,
-            max_tokens=1000,
-            response_format={"type": "json_object"}
+
+        request = build_analysis_request(publication_data)
+        if cache is not None:
+            cached = cache.get(request)
+            if cached is not None:
+                logger.info("Using cached analysis for publication")
+                return cached
+
+        if rate_limiter is not None:
+            await rate_limiter.acquire(estimate_request_tokens(request))
+
+        # Parse the schema-constrained response directly into the analysis model
+        response = await client.beta.chat.completions.parse(
+            **{**request, "response_format": ForeignAffiliationAnalysis}
         )
 
-        result = json.loads(response.choices[0].message.content)
+        message = response.choices[0].message
+        if message.parsed is None:
+            raise ValueError(f"Model did not return an analysis: {message.refusal}")
+        result = message.parsed.model_dump()
+        if cache is not None:
+            cache.set(request, result)
         logger.info("Successfully analyzed publication for foreign affiliations")
         return result
     except Exception as e:
-        logger.error(f"Error analyzing foreign affiliations: {str(e)}")
+        logger.error("Error analyzing foreign affiliations: %s", e)
         # Propagate the error instead of using simulated analysis
         raise e
 
-def generate_output_row(researcher, publication, analysis):
+async def analyze_batch(publications, rate_limiter=None, cache=None):
+    """
+    Analyze several publications with a single Azure OpenAI request.
+    Results are cached per publication, under the same key as a single-publication
+    request. If the model returns the wrong number of analyses, falls back to
+    one request per publication.
+    Returns a list of analysis dictionaries in the order of publications.
+    """
+    try:
+        results = [cache.get(build_analysis_request(pub)) if cache is not None else None for pub in publications]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            logger.info("Using cached analyses for %d publications", len(publications))
+            return results
+
+        if len(pending) == 1:
+            i = pending[0]
+            results[i] = await analyze_foreign_affiliations(publications[i], rate_limiter, cache)
+            return results
+
+        request = build_multi_analysis_request([publications[i] for i in pending])
+        if rate_limiter is not None:
+            await rate_limiter.acquire(estimate_request_tokens(request))
+
+        response = await client.beta.chat.completions.parse(**request, response_format=PublicationAnalyses)
+
+        parsed = response.choices[0].message.parsed
+        analyses = parsed.analyses if parsed is not None else []
+        if len(analyses) != len(pending):
+            logger.warning("Expected %d analyses but received %d, falling back to single requests", len(pending), len(analyses))
+            for i in pending:
+                results[i] = await analyze_foreign_affiliations(publications[i], rate_limiter, cache)
+            return results
+
+        for i, analysis in zip(pending, analyses):
+            results[i] = analysis.model_dump()
+            if cache is not None:
+                cache.set(build_analysis_request(publications[i]), results[i])
+
+        logger.info("Successfully analyzed %d publications in one request", len(pending))
+        return results
+    except Exception as e:
+        logger.error("Error analyzing publication batch: %s", e)
+        raise e
+
+async def run_realtime_analysis(publications, cache=None):
+    """
+    Analyze publications with concurrent real-time Azure OpenAI calls,
+    paced to stay within the deployment's RPM and TPM quotas. Publications
+    are sent ANALYSIS_BATCH_SIZE at a time per request.
+    Takes a dictionary mapping custom_id to publication data and returns
+    a dictionary mapping custom_id to analysis results.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    rate_limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+
+    async def analyze_with_limit(group):
+        async with semaphore:
+            return await analyze_batch(group, rate_limiter, cache)
+
+    keys = list(publications.keys())
+    pubs = list(publications.values())
+    groups = [pubs[i:i + ANALYSIS_BATCH_SIZE] for i in range(0, len(pubs), ANALYSIS_BATCH_SIZE)]
+
+    logger.info("Analyzing %d publications in %d requests with up to %d concurrent requests", len(pubs), len(groups), MAX_CONCURRENT_REQUESTS)
+    group_analyses = await asyncio.gather(*(analyze_with_limit(group) for group in groups))
+    analyses = [analysis for group in group_analyses for analysis in group]
+    return dict(zip(keys, analyses))
+
+def build_batch_jsonl(publications, file_path=BATCH_INPUT_FILE):
+    """
+    Write one Batch API request per publication to a JSONL file.
+    Takes a dictionary mapping custom_id to publication data and returns the file path.
+    """
+    with open(file_path, 'w') as f:
+        for custom_id, publication in publications.items():
+            f.write(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/chat/completions",
+                "body": build_analysis_request(publication)
+            }) + "\n")
+
+    logger.info("Wrote %d batch requests to %s", len(publications), file_path)
+    return file_path
+
+async def run_batch_analysis(publications, cache=None):
+    """
+    Analyze publications through the Azure OpenAI Batch API.
+    Publications already in the cache are not resubmitted. Uploads the remaining
+    requests, polls until the batch finishes, and returns a dictionary mapping
+    custom_id to analysis results.
+    """
+    try:
+        results = {}
+        pending = {}
+        for custom_id, publication in publications.items():
+            cached = cache.get(build_analysis_request(publication)) if cache is not None else None
+            if cached is not None:
+                results[custom_id] = cached
+            else:
+                pending[custom_id] = publication
+
+        logger.info("Using %d cached analyses, %d publications to submit", len(results), len(pending))
+        if not pending:
+            return results
+
+        input_path = build_batch_jsonl(pending)
+        with open(input_path, 'rb') as f:
+            batch_file = await client.files.create(file=f, purpose="batch")
+
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/chat/completions",
+            completion_window=BATCH_COMPLETION_WINDOW
+        )
+        logger.info("Submitted batch %s with %d requests", batch.id, len(pending))
+
+        # Poll until the batch reaches a terminal state
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            batch = await client.batches.retrieve(batch.id)
+            logger.info("Batch %s status: %s", batch.id, batch.status)
+
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch.id} finished with status: {batch.status}")
+
+        if batch.request_counts and batch.request_counts.failed:
+            logger.warning("Batch %s had %d failed requests", batch.id, batch.request_counts.failed)
+
+        if not batch.output_file_id:
+            logger.warning("Batch %s produced no output file", batch.id)
+            return results
+
+        # Join output rows back to publications by custom_id
+        output = await client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+
+            record = json.loads(line)
+            custom_id = record.get('custom_id')
+            response = record.get('response') or {}
+            if response.get('status_code') != 200:
+                logger.warning("Batch request %s failed: %s", custom_id, record.get('error'))
+                continue
+
+            try:
+                content = response['body']['choices'][0]['message']['content']
+                results[custom_id] = ForeignAffiliationAnalysis.model_validate_json(content).model_dump()
+                if cache is not None and custom_id in pending:
+                    cache.set(build_analysis_request(pending[custom_id]), results[custom_id])
+            except (KeyError, IndexError, ValueError) as e:
+                logger.warning("Could not parse batch result for %s: %s", custom_id, e)
+
+        logger.info("Retrieved analyses from batch %s, %d of %d publications analyzed", batch.id, len(results), len(publications))
+        return results
+    except Exception as e:
+        logger.error("Error in batch analysis: %s", e)
+        raise e
+
+def generate_output_row(author_name, publication, analysis):
     """
     Generate a row for the output CSV file.
     """
@@ -197,82 +515,137 @@ def generate_output_row(researcher, publication, analysis):
         return None
 
     try:
-        # Extract countries from analysis
+        # Extract countries from analysis and identify flagged countries
         countries = analysis.get('countries', [])
         if isinstance(countries, str):
-            countries = [countries]
+            # Already a single string; use it as is
+            countries_str = countries
+            flagged_countries = [countries] if COUNTRIES_OF_CONCERN_RE.search(countries) else []
+        else:
+            countries_str = ', '.join(countries)
+            # One regex scan finds any country of concern in the name
+            flagged_countries = [country for country in countries if COUNTRIES_OF_CONCERN_RE.search(country)]
         
-        # Extract funding sources from analysis
+        # Extract funding sources from analysis and format them as a string
         funding_sources = analysis.get('funding_sources', [])
-        if isinstance(funding_sources, str):
-            funding_sources = [funding_sources]
-        
-        # Format funding sources as a string
-        funding_str = ', '.join(funding_sources) if funding_sources else ''
-        
-        # Identify flagged countries
-        flagged_countries = []
-        all_countries = []
-        
-        for country in countries:
-            all_countries.append(country)
-            for concern in COUNTRIES_OF_CONCERN:
-                if concern.lower() in country.lower():
-                    flagged_countries.append(country)
-                    break
+        funding_str = funding_sources if isinstance(funding_sources, str) else ', '.join(funding_sources)
         
         # Determine if the publication is flagged
         is_flagged = len(flagged_countries) > 0
         
         return {
-            "publication_name": publication.get('journal', ''),
-            "research_title": publication.get('title', ''),
-            "author_name": f"{researcher['first_name']} {researcher['last_name']}",
+            "publication_name": publication.journal,
+            "research_title": publication.title,
+            "author_name": author_name,
             "organization_affiliation": "Boston Children's Hospital",
-            "countries_of_origin": ', '.join(all_countries),
+            "countries_of_origin": countries_str,
             "flagged": "Yes" if is_flagged else "No",
-            "flagged_countries": ', '.join(flagged_countries) if flagged_countries else "",
+            "flagged_countries": ', '.join(flagged_countries),
             "confidence_score": analysis.get('confidence_score', 0),
             "funding_source": funding_str
         }
     except Exception as e:
-        logger.error(f"Error generating output row: {str(e)}")
+        logger.error("Error generating output row: %s", e)
         return None
 
-def main():
+def publication_key(publication):
+    """
+    Build a stable key identifying a publication across researchers.
+    Uses the PMID when available and falls back to a hash of the title.
+    """
+    pmid = publication.pmid
+    if pmid:
+        return f"pmid:{pmid}"
+
+    title = ' '.join(str(publication.title or '').lower().split())
+    return f"title:{hashlib.sha256(title.encode()).hexdigest()[:16]}"
+
+async def main(realtime=False):
     """
     Main execution function for the foreign disclosure analysis tool.
+    Uses the Azure OpenAI Batch API unless realtime is set.
     """
+    cache = AnalysisCache(ANALYSIS_CACHE_FILE)
     try:
         # Load researchers
         researchers = load_researchers()
         
-        # Initialize results list
-        results = []
+        # Index unique publications by key; co-authored publications are analyzed once
+        pub_index = {}
+        pub_researchers = {}
 
-        # Process each researcher
-        for researcher in researchers:
-            logger.info(f"Processing researcher: {researcher['first_name']} {researcher['last_name']}")
-            
-            # Query PubMed for publications
-            publications = query_pubmed_publications(researcher)
-            
-            # Analyze each publication
+        # Query PubMed for all researchers in parallel, bounded to respect PubMed's rate limit
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PUBMED_QUERIES)
+
+        async def query_with_limit(researcher):
+            async with semaphore:
+                logger.info("Processing researcher: %s %s", researcher['first_name'], researcher['last_name'])
+                return await query_pubmed_publications(researcher)
+
+        all_publications = await asyncio.gather(*(query_with_limit(r) for r in researchers))
+
+        for researcher, publications in zip(researchers, all_publications):
+            # Build the author name once per researcher
+            author_name = f"{researcher['first_name']} {researcher['last_name']}"
             for pub in publications:
-                analysis = analyze_foreign_affiliations(pub)
-                if analysis:
-                    row = generate_output_row(researcher, pub, analysis)
-                    if row:
-                        results.append(row)
+                key = publication_key(pub)
+                pub_index.setdefault(key, pub)
+                authors = pub_researchers.setdefault(key, [])
+                if author_name not in authors:
+                    authors.append(author_name)
 
-        # Create output DataFrame and save to CSV
-        df = pd.DataFrame(results)
-        df.to_csv(OUTPUT_FILE, index=False)
-        logger.info(f"Analysis complete. Results saved to {OUTPUT_FILE}")
+        logger.info("Found %d unique publications across %d researchers", len(pub_index), len(researchers))
+
+        # Analyze each unique publication
+        if realtime:
+            analyses = await run_realtime_analysis(pub_index, cache)
+        else:
+            analyses = await run_batch_analysis(pub_index, cache)
+
+        # Stream rows to the output CSV as they are generated
+        row_count = 0
+        with open(OUTPUT_FILE, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS)
+            writer.writeheader()
+
+            # Fan each analysis out to every researcher on the publication
+            for key, pub in pub_index.items():
+                analysis = analyses.get(key)
+                if not analysis:
+                    continue
+                # Rows differ only by author, so build the row once per publication
+                authors = pub_researchers[key]
+                row = generate_output_row(authors[0], pub, analysis)
+                if not row:
+                    continue
+                for author_name in authors:
+                    row["author_name"] = author_name
+                    writer.writerow(row)
+                    row_count += 1
+                f.flush()
+
+        logger.info("Analysis complete. %d rows saved to %s", row_count, OUTPUT_FILE)
 
     except Exception as e:
-        logger.error(f"Error in main execution: {str(e)}")
+        logger.error("Error in main execution: %s", e)
         raise
+    finally:
+        cache.close()
+        # Also closes the pooled HTTP client
+        await client.close()
+
+def parse_args():
+    """
+    Parse command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Analyze PubMed publications of BCH researchers for foreign affiliations.")
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Analyze publications with real-time API calls instead of the Azure OpenAI Batch API"
+    )
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    asyncio.run(main(realtime=args.realtime))
@@ -3,18 +3,71 @@ Wrapper for the Clinical Research MCP Server.
 Provides functions to interact with PubMed and other clinical research databases.
 """
 
+import io
+import asyncio
+import re
 import logging
-import json
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Any, Iterator, Optional, Union
+from use_mcp_tool import use_mcp_tool
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# orjson parses large MCP payloads faster when installed; fall back to stdlib json
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+# ijson parses very large MCP payloads incrementally when installed
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Logging is configured once by the application entry point (main.py)
 logger = logging.getLogger(__name__)
 
-def use_pubmed_search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+# Publication fields included in columnar output; nested author records are
+# omitted since their affiliations are already flattened into 'affiliations'
+PUBLICATION_TABLE_COLUMNS = (
+    'title', 'journal', 'publication_date', 'abstract', 'doi', 'pmid',
+    'affiliations', 'funding_info', 'keywords', 'url'
+)
+
+# Candidate funding field names, in the order their contents are reported
+_FUNDING_FIELDS = ('funding', 'funding_info', 'grant_info', 'grants', 'acknowledgments')
+
+# Payloads larger than this many characters/bytes are streamed with ijson, if available
+STREAMING_THRESHOLD = 1_000_000
+_FIRST_JSON_CHAR = re.compile(rb'\S')
+
+# Default number of concurrent MCP calls issued by the batch search helpers
+MAX_SEARCH_WORKERS = 16
+
+@dataclass(slots=True)
+class Publication:
+    """
+    Standardized publication record produced from PubMed results.
+    """
+    title: str
+    authors: List[Any]
+    journal: str
+    publication_date: str
+    abstract: str
+    doi: str
+    pmid: str
+    affiliations: str
+    funding_info: str
+    keywords: List[Any]
+    url: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the record to a plain dictionary, e.g. for JSON serialization.
+        """
+        return asdict(self)
+
+def use_pubmed_search(params: Dict[str, Any], columnar: bool = False) -> Union[List[Publication], Any]:
     """
     Search PubMed for medical and scientific articles using the Clinical Research MCP Server.
     
@@ -27,14 +80,12 @@ def use_pubmed_search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
             - publication_types: Filter by publication types
             - fields: Specific fields to search
             - format: Output format for results
+        columnar: Return a pyarrow.Table instead of a list of records
             
     Returns:
-        List of publication dictionaries containing metadata
+        List of Publication records containing metadata, or a pyarrow.Table if columnar is set
     """
     try:
-        # Import the MCP tool
-        from use_mcp_tool import use_mcp_tool
-        
         # Validate required parameters
         if 'query' not in params:
             raise ValueError("Query parameter is required for PubMed search")
@@ -44,7 +95,7 @@ def use_pubmed_search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
             params['max_results'] = 10
         
         # Log the search query
-        logger.info(f"Searching PubMed with query: {params['query']}")
+        logger.info("Searching PubMed with query: %s", params['query'])
         
         # Call the MCP server tool
         result = use_mcp_tool(
@@ -54,89 +105,231 @@ def use_pubmed_search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
         )
         
         # Process the result
-        publications = process_pubmed_results(result)
+        publications = process_pubmed_results(result, columnar=columnar)
         
-        logger.info(f"Retrieved {len(publications)} publications from PubMed")
+        logger.info("Retrieved %d publications from PubMed", len(publications))
         return publications
         
     except Exception as e:
-        logger.error(f"Error in PubMed search: {str(e)}")
+        logger.error("Error in PubMed search: %s", e)
         # Propagate the error instead of returning an empty list
         raise e
 
-def process_pubmed_results(result: Any) -> List[Dict[str, Any]]:
+async def use_pubmed_search_async(params: Dict[str, Any], columnar: bool = False) -> Union[List[Publication], Any]:
+    """
+    Search PubMed without blocking the event loop, so many searches can run concurrently.
+    The search runs in a worker thread and shares use_mcp_tool's memoization.
+    
+    Args:
+        params: Search parameters, as for use_pubmed_search
+        columnar: Return a pyarrow.Table instead of a list of records
+        
+    Returns:
+        List of Publication records containing metadata, or a pyarrow.Table if columnar is set
+    """
+    return await asyncio.to_thread(use_pubmed_search, params, columnar)
+
+def use_pubmed_search_df(params: Dict[str, Any]) -> Any:
+    """
+    Search PubMed and return the publications as a columnar pyarrow.Table.
+    Requires the optional pyarrow dependency.
+    
+    Args:
+        params: Search parameters, as for use_pubmed_search
+        
+    Returns:
+        pyarrow.Table with one row per publication (see PUBLICATION_TABLE_COLUMNS)
+    """
+    return use_pubmed_search(params, columnar=True)
+
+def process_pubmed_results(result: Any, columnar: bool = False) -> Union[List[Publication], Any]:
     """
     Process raw PubMed results into a standardized format.
     
     Args:
         result: Raw result from the MCP server
+        columnar: Build a pyarrow.Table column by column instead of a list of records
         
     Returns:
-        List of publication dictionaries with standardized fields
+        List of Publication records with standardized fields, or a pyarrow.Table if columnar is set
     """
+    # Accumulate one list per column rather than a list of records
+    columns = {name: [] for name in PUBLICATION_TABLE_COLUMNS} if columnar else None
+    
     try:
-        # If result is a string, try to parse it as JSON
-        if isinstance(result, str):
-            result = json.loads(result)
+        publications = iter_pubmed_results(result)
+        if not columnar:
+            return list(publications)
         
-        # Initialize publications list
-        publications = []
+        for pub in publications:
+            for name, column in columns.items():
+                column.append(getattr(pub, name))
+    
+    except Exception as e:
+        logger.error("Error processing PubMed results: %s", e)
+        if not columnar:
+            return []
+        columns = {name: [] for name in PUBLICATION_TABLE_COLUMNS}
+    
+    # Built outside the try so that table errors propagate instead of yielding an empty table
+    return _build_publication_table(columns)
+
+def iter_pubmed_results(result: Any) -> Iterator[Publication]:
+    """
+    Lazily process raw PubMed results, yielding one standardized record at a time.
+    Consumers that stop early skip processing the remaining records. Unlike
+    process_pubmed_results, malformed results raise instead of yielding nothing.
+    
+    Args:
+        result: Raw result from the MCP server
+        
+    Returns:
+        Iterator over Publication records with standardized fields
+    """
+    is_payload = isinstance(result, (str, bytes, bytearray))
+    if is_payload and ijson is not None and len(result) > STREAMING_THRESHOLD:
+        # Decode large payloads one record at a time instead of as a whole tree
+        items = _stream_result_items(result)
+    else:
+        # If result is a string or raw bytes, try to parse it as JSON
+        if is_payload:
+            result = _json.loads(result)
         
         # Check if result is a list or has a 'results' field
-        items = result if isinstance(result, list) else result.get('results', [])
-        
-        for item in items:
-            # Extract and standardize publication data
-            pub = {
-                'title': item.get('title', ''),
-                'authors': item.get('authors', []),
-                'journal': item.get('journal', {}).get('name', '') if isinstance(item.get('journal'), dict) else item.get('journal', ''),
-                'publication_date': item.get('publication_date', ''),
-                'abstract': item.get('abstract', ''),
-                'doi': item.get('doi', ''),
-                'pmid': item.get('pmid', ''),
-                'affiliations': extract_affiliations(item),
-                'funding_info': extract_funding_info(item),
-                'keywords': item.get('keywords', []),
-                'url': item.get('url', '')
-            }
-            publications.append(pub)
+        items = result if isinstance(result, list) else (result or {}).get('results')
         
-        return publications
+        # Empty and failed searches skip the record loop entirely
+        if not items:
+            return
     
-    except Exception as e:
-        logger.error(f"Error processing PubMed results: {str(e)}")
-        return []
+    # Journals and affiliations repeat across records; keep one copy of each string
+    intern = {}.setdefault
+    
+    for item in items:
+        item_get = item.get
 
-def extract_affiliations(publication: Dict[str, Any]) -> str:
+        # Journal may be a plain name or a dict with a 'name' field; fetch it once
+        journal = item_get('journal', '')
+        if isinstance(journal, dict):
+            journal = journal.get('name', '')
+        if isinstance(journal, str):
+            journal = intern(journal, journal)
+        affiliations = extract_affiliations(item)
+
+        # Extract and standardize publication data
+        yield Publication(
+            title=item_get('title', ''),
+            authors=item_get('authors', []),
+            journal=journal,
+            publication_date=item_get('publication_date', ''),
+            abstract=item_get('abstract', ''),
+            doi=item_get('doi', ''),
+            pmid=item_get('pmid', ''),
+            affiliations=intern(affiliations, affiliations),
+            funding_info=extract_funding_info(item),
+            keywords=item_get('keywords', []),
+            url=item_get('url', '')
+        )
+
+def _build_publication_table(columns: Dict[str, List[Any]]) -> Any:
     """
-    Extract affiliations from a publication.
+    Build a pyarrow.Table from per-column publication values.
     
     Args:
-        publication: Publication data dictionary
+        columns: Mapping of column name to list of values
         
     Returns:
-        String containing all affiliations
+        pyarrow.Table with large_string text columns and a list<large_string> keywords column
+    """
+    # pyarrow is optional and only needed for columnar output
+    import pyarrow as pa
+    
+    arrays = {}
+    for name in PUBLICATION_TABLE_COLUMNS:
+        if name == 'keywords':
+            arrays[name] = pa.array([_keyword_list(v) for v in columns[name]], type=pa.list_(pa.large_string()))
+        else:
+            # JSON values such as numeric PMIDs are stored as their text
+            arrays[name] = pa.array([None if v is None else str(v) for v in columns[name]], type=pa.large_string())
+    return pa.table(arrays)
+
+def _keyword_list(keywords: Any) -> List[str]:
+    """
+    Normalize a keywords value to a list of strings; a single string is one keyword.
+    """
+    if isinstance(keywords, list):
+        return [str(k) for k in keywords if k is not None]
+    if isinstance(keywords, str):
+        return [keywords]
+    return []
+
+def _stream_result_items(payload: Any) -> Iterator[Dict[str, Any]]:
     """
-    affiliations = []
+    Incrementally parse publication records from a raw JSON payload with ijson.
     
+    Args:
+        payload: JSON text or bytes, either a list of records or an object with a 'results' list
+        
+    Returns:
+        Iterator over the publication records
+    """
+    data = payload.encode() if isinstance(payload, str) else payload
+    
+    # Top-level lists hold the records directly; otherwise they are under 'results'
+    first = _FIRST_JSON_CHAR.search(data)
+    prefix = 'item' if first and data[first.start():first.start() + 1] == b'[' else 'results.item'
+    return ijson.items(io.BytesIO(data), prefix, use_float=True)
+
+def _iter_affiliations(publication: Dict[str, Any]) -> Iterator[Any]:
+    """
+    Yield raw affiliation entries from a publication, in order.
+    """
     # Try to extract from different possible structures
-    if 'affiliations' in publication:
-        if isinstance(publication['affiliations'], list):
-            affiliations.extend(publication['affiliations'])
-        elif isinstance(publication['affiliations'], str):
-            affiliations.append(publication['affiliations'])
+    affiliations = publication.get('affiliations')
+    if isinstance(affiliations, list):
+        yield from affiliations
+    elif isinstance(affiliations, str):
+        yield affiliations
     
     # Try to extract from authors if available
-    if 'authors' in publication and isinstance(publication['authors'], list):
-        for author in publication['authors']:
-            if isinstance(author, dict) and 'affiliation' in author:
-                if isinstance(author['affiliation'], list):
-                    affiliations.extend(author['affiliation'])
-                else:
-                    affiliations.append(author['affiliation'])
+    authors = publication.get('authors')
+    if isinstance(authors, list):
+        for author in authors:
+            if isinstance(author, dict):
+                affiliation = author.get('affiliation')
+                if isinstance(affiliation, list):
+                    yield from affiliation
+                elif affiliation:
+                    yield affiliation
+
+def extract_affiliations(publication: Dict[str, Any]) -> str:
+    """
+    Extract affiliations from a publication.
     
-    return '; '.join(filter(None, affiliations))
+    Args:
+        publication: Publication data dictionary
+        
+    Returns:
+        String containing all affiliations
+    """
+    return '; '.join(a for a in _iter_affiliations(publication) if a)
+
+def _iter_funding_info(publication: Dict[str, Any]) -> Iterator[Any]:
+    """
+    Yield raw funding entries from a publication, in order.
+    """
+    # Visit fields in canonical order so the joined string is deterministic
+    for field in _FUNDING_FIELDS:
+        if field not in publication:
+            continue
+        value = publication[field]
+        if isinstance(value, list):
+            yield from value
+        elif isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                yield f"{key}: {item}"
 
 def extract_funding_info(publication: Dict[str, Any]) -> str:
     """
@@ -148,20 +341,7 @@ def extract_funding_info(publication: Dict[str, Any]) -> str:
     Returns:
         String containing funding information
     """
-    funding_info = []
-    
-    # Try different possible field names
-    for field in ['funding', 'funding_info', 'grant_info', 'grants', 'acknowledgments']:
-        if field in publication:
-            if isinstance(publication[field], list):
-                funding_info.extend(publication[field])
-            elif isinstance(publication[field], str):
-                funding_info.append(publication[field])
-            elif isinstance(publication[field], dict):
-                for key, value in publication[field].items():
-                    funding_info.append(f"{key}: {value}")
-    
-    return '; '.join(filter(None, funding_info))
+    return '; '.join(f for f in _iter_funding_info(publication) if f)
 
 def use_clinical_trials_search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -174,9 +354,6 @@ def use_clinical_trials_search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
         List of clinical trial dictionaries
     """
     try:
-        # Import the MCP tool
-        from use_mcp_tool import use_mcp_tool
-        
         # Call the MCP server tool
         result = use_mcp_tool(
             server_name="medical-server",
@@ -188,7 +365,7 @@ def use_clinical_trials_search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
         return result
         
     except Exception as e:
-        logger.error(f"Error in clinical trials search: {str(e)}")
+        logger.error("Error in clinical trials search: %s", e)
         raise e
 
 def use_fda_drug_search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -202,9 +379,6 @@ def use_fda_drug_search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
         List of drug information dictionaries
     """
     try:
-        # Import the MCP tool
-        from use_mcp_tool import use_mcp_tool
-        
         # Call the MCP server tool
         result = use_mcp_tool(
             server_name="medical-server",
@@ -216,5 +390,63 @@ def use_fda_drug_search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
         return result
         
     except Exception as e:
-        logger.error(f"Error in FDA drug search: {str(e)}")
+        logger.error("Error in FDA drug search: %s", e)
         raise e
+
+def _run_search_batch(search: Callable[[Dict[str, Any]], Any], params_list: List[Dict[str, Any]], max_workers: int) -> List[Any]:
+    """
+    Run a search wrapper over many parameter sets concurrently in a thread pool.
+    
+    Args:
+        search: Search wrapper to call for each parameter set
+        params_list: List of search parameter dictionaries
+        max_workers: Maximum number of concurrent calls
+        
+    Returns:
+        List of search results in the same order as params_list
+    """
+    if not params_list:
+        return []
+    
+    # MCP calls are I/O-bound, so threads overlap the network round-trips
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(params_list))) as executor:
+        return list(executor.map(search, params_list))
+
+def use_pubmed_search_batch(params_list: List[Dict[str, Any]], max_workers: int = MAX_SEARCH_WORKERS) -> List[List[Publication]]:
+    """
+    Run several PubMed searches concurrently.
+    
+    Args:
+        params_list: List of parameter dictionaries accepted by use_pubmed_search
+        max_workers: Maximum number of concurrent searches
+        
+    Returns:
+        List of processed publication lists, one per parameter set
+    """
+    return _run_search_batch(use_pubmed_search, params_list, max_workers)
+
+def use_clinical_trials_search_batch(params_list: List[Dict[str, Any]], max_workers: int = MAX_SEARCH_WORKERS) -> List[Any]:
+    """
+    Run several ClinicalTrials.gov searches concurrently.
+    
+    Args:
+        params_list: List of parameter dictionaries accepted by use_clinical_trials_search
+        max_workers: Maximum number of concurrent searches
+        
+    Returns:
+        List of search results, one per parameter set
+    """
+    return _run_search_batch(use_clinical_trials_search, params_list, max_workers)
+
+def use_fda_drug_search_batch(params_list: List[Dict[str, Any]], max_workers: int = MAX_SEARCH_WORKERS) -> List[Any]:
+    """
+    Run several FDA drug searches concurrently.
+    
+    Args:
+        params_list: List of parameter dictionaries accepted by use_fda_drug_search
+        max_workers: Maximum number of concurrent searches
+        
+    Returns:
+        List of search results, one per parameter set
+    """
+    return _run_search_batch(use_fda_drug_search, params_list, max_workers)
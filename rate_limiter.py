@@ -0,0 +1,68 @@
+"""
+Client-side request pacing for Azure OpenAI.
+Keeps requests within the deployment's requests-per-minute (RPM) and
+tokens-per-minute (TPM) quotas.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Tuple
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """
+    Sliding-window limiter that reserves both a request slot and the request's
+    token count before each Azure OpenAI call.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, window: float = 60.0):
+        """
+        Args:
+            requests_per_minute: Maximum number of requests per window
+            tokens_per_minute: Maximum number of tokens (prompt + completion budget) per window
+            window: Length of the sliding window in seconds
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._reservations: Deque[Tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float) -> None:
+        """
+        Drop reservations that have left the sliding window.
+        """
+        while self._reservations and self._reservations[0][0] + self.window <= now:
+            _, tokens = self._reservations.popleft()
+            self._tokens_in_window -= tokens
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait until a request consuming the given number of tokens fits within both quotas.
+
+        Args:
+            tokens: Estimated tokens for the request
+        """
+        # A request larger than the whole quota can never fit; let it through on an empty window
+        tokens = min(tokens, self.tokens_per_minute)
+
+        # Waiters queue on the lock, so reservations are granted in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+
+                if (len(self._reservations) < self.requests_per_minute and
+                        self._tokens_in_window + tokens <= self.tokens_per_minute):
+                    self._reservations.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+
+                # Sleep until the oldest reservation leaves the window
+                delay = self._reservations[0][0] + self.window - now
+                logger.debug("Rate limit reached, waiting %.1fs", delay)
+                await asyncio.sleep(delay)
@@ -1,23 +1,68 @@
 """
 Wrapper for the MCP tool functionality.
-This module provides a function to interact with MCP servers.
+This module provides blocking and asyncio functions to interact with MCP servers.
 """
 
+import asyncio
+import functools
 import logging
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Union
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# orjson encodes cache keys faster when installed; fall back to stdlib json
+try:
+    import orjson
+    
+    def _canonical_json(arguments: Dict[str, Any]) -> Union[str, bytes]:
+        # Non-str keys are stringified like json.dumps does instead of raising
+        return orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _canonical_json(arguments: Dict[str, Any]) -> Union[str, bytes]:
+        return json.dumps(arguments, sort_keys=True)
+
+# Logging is configured once by the application entry point (main.py)
 logger = logging.getLogger(__name__)
 
+# Read-only tools whose results depend only on their arguments, safe to memoize
+CACHEABLE_TOOLS = frozenset({"pubmed-search", "clinical-trials-search", "fda-drug-search"})
+MCP_CACHE_SIZE = 1024
+
+# Default number of concurrent calls issued by use_mcp_tools_parallel
+MCP_MAX_CONCURRENT_CALLS = 16
+
 def use_mcp_tool(server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
     """
     Use an MCP tool from a connected MCP server.
     
+    Results of tools in CACHEABLE_TOOLS are memoized per (server, tool, arguments),
+    so repeated identical calls skip the round-trip. Cached results are shared
+    between callers and must not be mutated.
+    
+    Args:
+        server_name: The name of the MCP server providing the tool
+        tool_name: The name of the tool to execute
+        arguments: A dictionary containing the tool's input parameters
+        
+    Returns:
+        The result of the tool execution
+    """
+    if tool_name in CACHEABLE_TOOLS:
+        # Canonical JSON gives a hashable key for the (unhashable) arguments dict
+        return _use_mcp_tool_cached(server_name, tool_name, _canonical_json(arguments))
+    return _call_mcp_tool(server_name, tool_name, arguments)
+
+@functools.lru_cache(maxsize=MCP_CACHE_SIZE)
+def _use_mcp_tool_cached(server_name: str, tool_name: str, arguments_json: Union[str, bytes]) -> Any:
+    """
+    Memoized MCP tool call keyed by the canonical JSON of its arguments.
+    Failed calls raise and are not cached.
+    """
+    return _call_mcp_tool(server_name, tool_name, json.loads(arguments_json))
+
+def _call_mcp_tool(server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+    """
+    Execute an MCP tool call against the server.
+    
     Args:
         server_name: The name of the MCP server providing the tool
         tool_name: The name of the tool to execute
@@ -29,12 +74,48 @@ def use_mcp_tool(server_name: str, tool_name: str, arguments: Dict[str, Any]) ->
     try:
         # Import the actual MCP tool functionality
         # This is where we would normally call the actual MCP server
-        logger.info(f"Using MCP tool: {tool_name} from server: {server_name}")
+        logger.info("Using MCP tool: %s from server: %s", tool_name, server_name)
         
         # For now, we'll raise an exception to indicate that the MCP server is not available
         # This will force the application to fail rather than use simulated data
         raise ConnectionError(f"Cannot connect to MCP server: {server_name}. Please ensure the server is running and accessible.")
             
     except Exception as e:
-        logger.error(f"Error using MCP tool {server_name}/{tool_name}: {str(e)}")
+        logger.error("Error using MCP tool %s/%s: %s", server_name, tool_name, e)
         raise e
+
+async def use_mcp_tool_async(server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+    """
+    Use an MCP tool without blocking the event loop.
+    
+    The blocking call runs in a worker thread, so results share use_mcp_tool's
+    memoization and cache key, and cached results must not be mutated.
+    
+    Args:
+        server_name: The name of the MCP server providing the tool
+        tool_name: The name of the tool to execute
+        arguments: A dictionary containing the tool's input parameters
+        
+    Returns:
+        The result of the tool execution
+    """
+    return await asyncio.to_thread(use_mcp_tool, server_name, tool_name, arguments)
+
+async def use_mcp_tools_parallel(calls: List[Tuple[str, str, Dict[str, Any]]], max_concurrent: int = MCP_MAX_CONCURRENT_CALLS) -> List[Any]:
+    """
+    Use several MCP tools concurrently from the event loop.
+    
+    Args:
+        calls: List of (server_name, tool_name, arguments) tuples
+        max_concurrent: Maximum number of these calls in flight at once
+        
+    Returns:
+        List of tool results in the same order as calls
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    
+    async def call_with_limit(server_name, tool_name, arguments):
+        async with semaphore:
+            return await use_mcp_tool_async(server_name, tool_name, arguments)
+    
+    return await asyncio.gather(*(call_with_limit(*call) for call in calls))